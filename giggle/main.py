@@ -28,7 +28,6 @@
 import os
 import click
 import logging
-from giggle import ssg
 from giggle import utils
 from giggle.__init__ import __version__
 
@@ -80,8 +79,16 @@ def cli():
     help= "generates production html"
 )
 
+@click.option(
+    '--jobs',
+    '-j',
+    type = click.IntRange(min=1),
+    default = None,
+    help = 'Number of parallel workers for copying assets and converting markdown'
+)
+
 @cli.command()
-def cook(build_dir, recipe, verbose, no_clear):
+def cook(build_dir, recipe, verbose, no_clear, production, jobs):
     """Cooks a yummy website from the provided recipe"""
 
     logging.root.setLevel(verbose.upper())
@@ -94,18 +101,24 @@ def cook(build_dir, recipe, verbose, no_clear):
     logger.info('************ Giggle Static Site Generator ************ ')
     logger.info('\n\n')
 
-    #directory setup
-    utils.directory_setup(build_dir, recipe)
-    #Creating the build directory
-    if os.path.exists(build_dir):
-        shutil.rmtree(build_dir)
-    logger.info("building...")
-    os.makedirs(build_dir,exist_ok=True)
     recipe= utils.load_yaml(recipe)
-    utils.mover(f"{here}/other_const/.htaccess", f"{build_dir}/.htaccess")
-    utils.mover(f"{here}/other_const/vercel.json`", f"{build_dir}/vercel.json`")
+    #Clearing the build directory before anything is copied into it; with
+    #--no_clear the previous build is kept and unchanged pages are skipped
+    if not no_clear:
+        utils.clean_dir(build_dir)
+    logger.info("building...")
+    #directory setup
+    utils.directory_setup(build_dir, recipe, jobs)
+    # deferred so that --help/--version do not pull in markdown and jinja2
+    from giggle import ssg
+    other_const = os.path.join(here, "constants", "other_const")
+    utils.copy_files([
+        (os.path.join(other_const, name), os.path.join(build_dir, name))
+        for name in (".htaccess", "vercel.json")
+    ], jobs)
     ssg_inst= ssg.ssg(recipe=recipe,
-                      build=build_dir)
+                      build=build_dir,
+                      jobs=jobs)
     ssg_inst.generate()
 
 if __name__ == '__main__':
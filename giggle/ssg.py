@@ -1,28 +1,239 @@
 """The static site generator"""
 
 import os
+import re
+import json
 import pathlib
+import hashlib
 import logging
-from typing import Dict, List, Generator, Optional, Any
+from importlib import metadata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Generator, Optional, Any, Tuple
 
 import markdown
-from jinja2 import Environment, FileSystemLoader
+from markdown.extensions.meta import BEGIN_RE, END_RE, META_RE, META_MORE_RE
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+# cmark-gfm's C renderer is used when a recipe sets features.fast_markdown
+try:
+    import cmarkgfm
+    from cmarkgfm.cmark import Options as cmarkgfmOptions
+except ImportError:
+    cmarkgfm = None
 
 from giggle import __version__
+from giggle import utils
 import giggle.template as giggle_template
 
 logger = logging.getLogger(__name__)
 
+# Below this many files the process pool start-up costs more than it saves
+PARALLEL_THRESHOLD = 16
+
+# Building a Markdown instance registers every extension, so one is kept per
+# process and reset() between documents instead.
+_MARKDOWN = markdown.Markdown(extensions=['meta'])
+
+# Records what each output was built from, so --no_clear builds can skip it
+MANIFEST_NAME = ".giggle-manifest.json"
+
+# Splits a tags header into its tags, dropping the whitespace around commas
+_TAG_SPLIT = re.compile(r'\s*,\s*')
+
+def _list_markdown_files(directory: str) -> List[str]:
+    """
+    List the markdown files directly inside a directory.
+
+    Uses os.scandir so the file type comes from the directory read itself
+    instead of an extra stat per entry.
+
+    Args:
+        directory (str): Directory to scan
+
+    Returns:
+        List of markdown filenames
+    """
+    with os.scandir(directory) as entries:
+        return [
+            entry.name for entry in entries
+            if entry.name.endswith(".md") and entry.is_file()
+        ]
+
+def _scan_meta(lines) -> Tuple[Dict[str, List[str]], int]:
+    """
+    Read the meta headers at the start of a markdown document.
+
+    Applies the same rules as python-markdown's 'meta' extension and stops
+    at the end of the header block, so the rest of the input is not consumed.
+
+    Args:
+        lines: Iterable of source lines
+
+    Returns:
+        Tuple of the meta headers (lower-cased keys mapped to lists of values)
+        and the index of the first body line
+    """
+    meta = {}
+    key = None
+    index = 0
+    for index, line in enumerate(lines):
+        line = line.rstrip('\r\n').expandtabs(4)
+        if index == 0 and BEGIN_RE.match(line):
+            continue
+        if line.strip() == '' or END_RE.match(line):
+            return meta, index + 1
+        m1 = META_RE.match(line)
+        if m1:
+            key = m1.group('key').lower().strip()
+            meta.setdefault(key, []).append(m1.group('value').strip())
+            continue
+        m2 = META_MORE_RE.match(line)
+        if m2 and key:
+            meta[key].append(m2.group('value').strip())
+        else:
+            return meta, index
+    return meta, index + 1
+
+def _list_javascript_files(js_dir: str) -> Tuple[Tuple[str, int, int], ...]:
+    """
+    List the JavaScript assets shipped in a package directory.
+
+    A single scandir pass provides both the names and the stat results.
+
+    Args:
+        js_dir (str): Directory holding the assets
+
+    Returns:
+        Tuple of (filename, mtime_ns, size) for each .js file
+    """
+    with os.scandir(js_dir) as entries:
+        return tuple(
+            (entry.name, st.st_mtime_ns, st.st_size)
+            for entry in entries
+            if entry.name.endswith('.js') and entry.is_file()
+            for st in (entry.stat(),)
+        )
+
+def _parse_markdown(markdown_path: str, fast: bool = False) -> Tuple[str, Dict[str, List[str]]]:
+    """
+    Parse a markdown file into its HTML body and meta headers.
+
+    Args:
+        markdown_path (str): Path to the markdown source
+        fast (bool): Render the body with cmark-gfm instead of python-markdown;
+            ignored when cmarkgfm is not installed
+
+    Returns:
+        Tuple of the HTML body and the meta headers
+    """
+    with open(markdown_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if fast and cmarkgfm is not None:
+        lines = content.splitlines(keepends=True)
+        meta, body_start = _scan_meta(lines)
+        body = ''.join(lines[body_start:])
+        # python-markdown passes raw HTML through; cmark only does when unsafe
+        html = cmarkgfm.github_flavored_markdown_to_html(
+            body, options=cmarkgfmOptions.CMARK_OPT_UNSAFE)
+        return html, meta
+    md = _MARKDOWN.reset()
+    html = md.convert(content)
+    return html, md.Meta
+
+def _read_markdown_meta(markdown_path: str) -> Dict[str, List[str]]:
+    """
+    Read only the meta headers of a markdown file.
+
+    The body is never read or parsed.
+
+    Args:
+        markdown_path (str): Path to the markdown source
+
+    Returns:
+        Meta headers, lower-cased keys mapped to lists of values
+    """
+    with open(markdown_path, 'r', encoding='utf-8') as f:
+        return _scan_meta(f)[0]
+
+def _convert_markdown_file(markdown_path: str, fast: bool = False) -> str:
+    """
+    Convert a markdown file to HTML.
+
+    Kept at module level so it can be shipped to a process pool.
+
+    Args:
+        markdown_path (str): Path to the markdown source
+        fast (bool): Render with cmark-gfm, see _parse_markdown
+
+    Returns:
+        Rendered HTML body
+    """
+    return _parse_markdown(markdown_path, fast)[0]
+
+def _canonical(value: Any) -> Any:
+    """
+    Make parsed recipe data JSON-serialisable with sortable keys.
+
+    YAML mappings can mix key types (ruamel loads 'pages: {404: ...}' with an
+    int key), which json.dumps(sort_keys=True) cannot order. Non-str keys are
+    rewritten with their type name so they still differ from equal strings.
+
+    Args:
+        value: Parsed recipe data
+
+    Returns:
+        The same data with every mapping key a str
+    """
+    if isinstance(value, dict):
+        return {
+            (key if isinstance(key, str) else f"{type(key).__name__}:{key!r}"):
+                _canonical(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+def _file_sha1(path: str) -> str:
+    """
+    Hash the contents of a file.
+
+    Args:
+        path (str): File to hash
+
+    Returns:
+        Hex SHA-1 digest
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _write_output(path: str, content: str) -> None:
+    """
+    Write generated text to the build directory.
+
+    The text is encoded once and written straight to a raw descriptor,
+    skipping the buffered and text-mode file layers.
+
+    Args:
+        path (str): Output file path
+        content (str): Generated text
+    """
+    data = memoryview(content.encode('utf-8'))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may return short for large buffers
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
 class blog_creater():
     def __init__(self, **kwargs):
         self.recipe= kwargs["recipe"]
         self.blog_list= None
         if "blogs" in self.recipe["nav_items"]:
             self.blogs_path= self.recipe["nav_items"]["blogs"]["path"]
-            self.blog_list=[]
-            for file in os.listdir(self.blogs_path):
-                if file.endswith(".md"):
-                    self.blog_list.append(file)
+            self.blog_list= _list_markdown_files(self.blogs_path)
 
     def _get_blog_files(self) -> List[str]:
         """
@@ -32,12 +243,9 @@ class blog_creater():
             List of blog markdown filenames
         """
         try:
-            return [
-                file for file in os.listdir(self.blogs_path) 
-                if file.endswith(".md")
-            ]
+            return _list_markdown_files(self.blogs_path)
         except OSError as e:
-            logger.error(f"Error reading blog directory: {e}")
+            logger.error("Error reading blog directory: %s", e)
             return []
 
     def generate_blog_collection_page(self) -> str:
@@ -47,14 +255,16 @@ class blog_creater():
         Returns:
             HTML string representing blog collection
         """
-        blog_list_html = ""
+        render_entry = giggle_template.blog_template.format_map
+        entries = []
         for blog in self.blog_list:
             try:
                 blog_metadata = self._extract_blog_metadata(blog)
                 if blog_metadata:
-                    blog_list_html += giggle_template.blog_template.format(**blog_metadata)
+                    entries.append(render_entry(blog_metadata))
             except Exception as e:
-                logger.warning(f"Could not process blog {blog}: {e}")
+                logger.warning("Could not process blog %s: %s", blog, e)
+        blog_list_html = "".join(entries)
 
         return f"""
         <ul>
@@ -71,21 +281,16 @@ class ssg():
         self.blog_list= None
         if "blogs" in self.recipe["nav_items"]:
             self.blogs_path= self.recipe["nav_items"]["blogs"]["path"]
-            self.blog_list=[]
-            for file in os.listdir(self.blogs_path):
-                if file.endswith(".md"):
-                    self.blog_list.append(file)
+            self.blog_list= _list_markdown_files(self.blogs_path)
 
     def tag_db_creater(self):
         tag_db={}
         for page in self.recipe["pages"]:
             file_path= self.recipe["pages"][page]
             html_path= "../"+page+".html"
-            data = pathlib.Path(file_path).read_text(encoding='utf-8')
-            md = markdown.Markdown(extensions = ['meta'])
-            md.convert(data)
-            if "tags" in md.Meta:
-                tag_list= md.Meta["tags"][0].split(",")
+            meta = _read_markdown_meta(file_path)
+            if "tags" in meta:
+                tag_list= meta["tags"][0].split(",")
                 for tag in tag_list:
                     if tag not in tag_db:
                         tag_db.update({tag:[html_path]})
@@ -94,13 +299,11 @@ class ssg():
         if self.blog_list is not None:
             for blog in self.blog_list:
                 blog_file_path= os.path.join(self.blogs_path, blog)
-                data = pathlib.Path(blog_file_path).read_text(encoding='utf-8')
-                md = markdown.Markdown(extensions = ['meta'])
-                md.convert(data)
+                meta = _read_markdown_meta(blog_file_path)
                 file= blog.replace(".md",".html")
                 html_path= "../blog/"+ file
-                if "tags" in md.Meta:
-                    tag_list= md.Meta["tags"][0].split(",")
+                if "tags" in meta:
+                    tag_list= meta["tags"][0].split(",")
                     for tag in tag_list:
                         if tag not in tag_db:
                             tag_db.update({tag:[html_path]})
@@ -134,24 +337,21 @@ class TagProcessor:
         
         def process_tags(file_path: str, html_path: str):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    md = markdown.Markdown(extensions=['meta'])
-                    md.convert(content)
-                    
-                    if 'tags' in md.Meta:
-                        tag_list = [tag.strip() for tag in md.Meta['tags'][0].split(',')]
-                        for tag in tag_list:
-                            normalized_tag = tag.lower().replace(" ", "-")
-                            if normalized_tag not in tag_db:
-                                tag_db[normalized_tag] = {
-                                    'display_name': tag,
-                                    'pages': [html_path]
-                                }
-                            else:
-                                tag_db[normalized_tag]['pages'].append(html_path)
+                meta = _read_markdown_meta(file_path)
+                tags = meta.get('tags')
+                if tags:
+                    for tag in _TAG_SPLIT.split(tags[0].strip()):
+                        normalized_tag = tag.lower().replace(" ", "-")
+                        entry = tag_db.get(normalized_tag)
+                        if entry is None:
+                            tag_db[normalized_tag] = {
+                                'display_name': tag,
+                                'pages': [html_path]
+                            }
+                        else:
+                            entry['pages'].append(html_path)
             except Exception as e:
-                logger.error(f"Error processing tags in {file_path}: {e}")
+                logger.error("Error processing tags in %s: %s", file_path, e)
         
         # Process main pages
         for page, file_path in self.recipe.get("pages", {}).items():
@@ -164,17 +364,48 @@ class TagProcessor:
 class StaticSiteGenerator:
     """Main class for generating a static site."""
     
-    def __init__(self, recipe: Dict[str, Any], build_dir: str):
+    def __init__(self, recipe: Dict[str, Any], build_dir: str, jobs: Optional[int] = None):
         """
         Initialize static site generator.
         
         Args:
             recipe (Dict): Site configuration
             build_dir (str): Output directory for generated site
+            jobs (int, optional): Worker processes for markdown conversion,
+                1 disables the pool (default: cpu count)
         """
         self.recipe = recipe
         self.build_dir = build_dir
+        self.jobs = jobs
         self.blogs_path = recipe.get("nav_items", {}).get("blogs", {}).get("path")
+        self.fast_markdown = bool(recipe.get("features", {}).get("fast_markdown"))
+        if self.fast_markdown and cmarkgfm is None:
+            logger.warning("features.fast_markdown is set but cmarkgfm is not "
+                           "installed; using python-markdown")
+            self.fast_markdown = False
+
+        # One environment for the whole build so compiled templates are shared
+        # between phases; the bytecode cache carries them across runs. The
+        # templates ship with giggle and do not change mid-build, so loaded
+        # templates are not re-checked for changes.
+        self.env = Environment(
+            loader=FileSystemLoader(
+                os.path.join(os.path.dirname(__file__), "constants/jinja_templates")
+            ),
+            bytecode_cache=FileSystemBytecodeCache(),
+            auto_reload=False
+        )
+        # Shared by every render, so only the per-page values are passed in
+        self.env.globals.update(recipe=self.recipe, version=__version__)
+        self._tpl_base = self.env.get_template("base.jinja")
+        self._tpl_css = self.env.get_template("style.css.jinja")
+        self._tpl_blog_post = self.env.get_template("back_base.jinja")
+
+        self._manifest_path = os.path.join(build_dir, MANIFEST_NAME)
+        self._manifest = self._load_manifest()
+        self._build_key = self._compute_build_key()
+        # manifest keys of the outputs this build produces
+        self._expected_outputs = set()
         
         # Setup logging
         logging.basicConfig(
@@ -193,67 +424,253 @@ class StaticSiteGenerator:
         self._copy_javascript_files()
         self._generate_blog_pages()
         self._generate_tag_pages()
+        self._save_manifest()
         
         logger.info("Static site generation completed")
 
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the manifest left by the previous build, if any.
+
+        Returns:
+            Mapping of output path to the inputs it was built from
+        """
+        try:
+            with open(self._manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _save_manifest(self):
+        """
+        Write the manifest for the next --no_clear build.
+
+        Outputs recorded by an earlier build that this build no longer
+        produces, such as pages removed from the recipe, are deleted.
+        """
+        for key in list(self._manifest):
+            if key in self._expected_outputs:
+                continue
+            del self._manifest[key]
+            # keys are relative to the build directory; never follow others
+            if os.path.isabs(key) or key.split(os.sep)[0] == os.pardir:
+                continue
+            try:
+                os.remove(os.path.join(self.build_dir, key))
+                logger.info("Removed stale output: %s", key)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Could not remove stale output %s: %s", key, e)
+        try:
+            _write_output(self._manifest_path, json.dumps(self._manifest))
+        except OSError as e:
+            logger.warning("Could not write build manifest: %s", e)
+
+    def _compute_build_key(self) -> str:
+        """
+        Digest of everything besides its source that an output depends on.
+
+        Covers the recipe, the giggle version, the markdown renderer and the
+        templates, so changing any of them rebuilds every page.
+
+        Returns:
+            Hex SHA-1 digest
+        """
+        h = hashlib.sha1()
+        h.update(__version__.encode())
+        h.update(self._renderer_id().encode())
+        h.update(json.dumps(_canonical(self.recipe), sort_keys=True,
+                            default=str).encode())
+        for template_dir in self.env.loader.searchpath:
+            with os.scandir(template_dir) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.is_file():
+                        st = entry.stat()
+                        h.update(f"{entry.name}:{st.st_mtime_ns}:{st.st_size};".encode())
+        return h.hexdigest()
+
+    def _renderer_id(self) -> str:
+        """
+        Name and version of the library pages are rendered with.
+
+        Returns:
+            Renderer identity, e.g. 'markdown 3.6'
+        """
+        if self.fast_markdown:
+            try:
+                return f"cmarkgfm {metadata.version('cmarkgfm')}"
+            except metadata.PackageNotFoundError:
+                return "cmarkgfm"
+        return f"markdown {markdown.__version__}"
+
+    def _manifest_key(self, output_path: str) -> str:
+        """
+        Manifest key of an output: its path relative to the build directory,
+        so 'build' and './build' share entries.
+
+        Args:
+            output_path (str): Generated file
+
+        Returns:
+            Normalised relative path
+        """
+        return os.path.relpath(os.path.abspath(output_path),
+                               os.path.abspath(self.build_dir))
+
+    def _is_up_to_date(self, output_path: str, source_path: Optional[str] = None) -> bool:
+        """
+        Check whether an output can be kept from the previous build.
+
+        The source is compared by stat first and only hashed when its stat
+        changed, so a touched but unmodified file is still skipped.
+
+        Args:
+            output_path (str): Generated file
+            source_path (str, optional): Markdown source of the output
+
+        Returns:
+            True when neither the source nor the build key changed
+        """
+        key = self._manifest_key(output_path)
+        self._expected_outputs.add(key)
+        entry = self._manifest.get(key)
+        if not entry or entry.get("build") != self._build_key:
+            return False
+        if not os.path.exists(output_path):
+            return False
+        if source_path is None:
+            return True
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return False
+        if [st.st_mtime_ns, st.st_size] == entry.get("src_stat"):
+            return True
+        if _file_sha1(source_path) != entry.get("src_sha1"):
+            return False
+        entry["src_stat"] = [st.st_mtime_ns, st.st_size]
+        return True
+
+    def _record_output(self, output_path: str, source_path: Optional[str] = None):
+        """
+        Note in the manifest what an output was just built from.
+
+        Args:
+            output_path (str): Generated file
+            source_path (str, optional): Markdown source of the output
+        """
+        entry = {"build": self._build_key}
+        if source_path is not None:
+            st = os.stat(source_path)
+            entry["src_stat"] = [st.st_mtime_ns, st.st_size]
+            entry["src_sha1"] = _file_sha1(source_path)
+        self._manifest[self._manifest_key(output_path)] = entry
+
+    def _convert_pages(self, pages: Dict[str, str]) -> Dict[str, str]:
+        """
+        Convert the markdown source of every page to HTML.
+
+        Large sites are converted on a process pool, small ones serially.
+
+        Args:
+            pages (Dict): Mapping of page name to markdown path
+
+        Returns:
+            Mapping of page name to HTML body for pages that converted
+        """
+        bodies = {}
+        if len(pages) < PARALLEL_THRESHOLD or self.jobs == 1:
+            for page, markdown_path in pages.items():
+                try:
+                    bodies[page] = _convert_markdown_file(markdown_path, self.fast_markdown)
+                except Exception as e:
+                    logger.error("Error generating page %s: %s", page, e)
+            return bodies
+
+        # the pool forks, so no other thread may be running at that point
+        utils.wait_for_cleanup()
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {
+                page: executor.submit(_convert_markdown_file, markdown_path,
+                                      self.fast_markdown)
+                for page, markdown_path in pages.items()
+            }
+            for page, future in futures.items():
+                try:
+                    bodies[page] = future.result()
+                except Exception as e:
+                    logger.error("Error generating page %s: %s", page, e)
+        return bodies
+
     def _generate_pages(self):
         """Generate HTML pages from markdown sources."""
-        env = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "constants/jinja_templates")
-        ))
-        base_template = env.get_template("base.jinja")
+        base_template = self._tpl_base
         
+        pages = {}
         for page, markdown_path in self.recipe.get("pages", {}).items():
+            output_path = os.path.join(self.build_dir, f"{page}.html")
+            if self._is_up_to_date(output_path, markdown_path):
+                logger.debug("Page %s.html is up to date", page)
+            else:
+                pages[page] = markdown_path
+
+        bodies = self._convert_pages(pages)
+        for page, body in bodies.items():
             try:
-                with open(markdown_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    md = markdown.Markdown(extensions=['meta'])
-                    body = md.convert(content)
-                    
-                rendered_page = base_template.render(
-                    recipe=self.recipe, 
-                    body=body, 
-                    back=" "
-                )
+                rendered_page = base_template.render(body=body, back=" ")
                 
                 output_path = os.path.join(self.build_dir, f"{page}.html")
-                with open(output_path, "w", encoding='utf-8') as f:
-                    f.write(rendered_page)
+                _write_output(output_path, rendered_page)
+                self._record_output(output_path, pages[page])
                 
-                logger.info(f"Generated page: {page}.html")
+                logger.info("Generated page: %s.html", page)
             except Exception as e:
-                logger.error(f"Error generating page {page}: {e}")
+                logger.error("Error generating page %s: %s", page, e)
 
     def _generate_css(self):
         """Generate CSS file from Jinja template."""
-        env = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "constants/jinja_templates")
-        ))
-        css_template = env.get_template("style.css.jinja")
+        css_template = self._tpl_css
+        output_path = os.path.join(self.build_dir, "style.css")
+        if self._is_up_to_date(output_path):
+            logger.debug("style.css is up to date")
+            return
         
-        rendered_css = css_template.render(recipe=self.recipe)
+        rendered_css = css_template.render()
         
-        with open(os.path.join(self.build_dir, "style.css"), "w", encoding='utf-8') as f:
-            f.write(rendered_css)
+        _write_output(output_path, rendered_css)
+        self._record_output(output_path)
         
         logger.info("Generated style.css")
 
     def _copy_javascript_files(self):
         """Copy JavaScript files to build directory."""
-        import shutil
-        
         js_dir = os.path.join(os.path.dirname(__file__), "constants")
-        js_files = [f for f in os.listdir(js_dir) if f.endswith('.js')]
         
-        for js_file in js_files:
+        pairs = []
+        for js_file, src_mtime_ns, src_size in _list_javascript_files(js_dir):
             src_path = os.path.join(js_dir, js_file)
             dest_path = os.path.join(self.build_dir, js_file)
             
+            # Skip copies that are already up to date (--no_clear builds)
             try:
-                shutil.copy2(src_path, dest_path)
-                logger.info(f"Copied JavaScript file: {js_file}")
-            except Exception as e:
-                logger.error(f"Error copying {js_file}: {e}")
+                dest_stat = os.stat(dest_path)
+                if (dest_stat.st_size == src_size
+                        and src_mtime_ns <= dest_stat.st_mtime_ns):
+                    continue
+            except FileNotFoundError:
+                pass
+            pairs.append((src_path, dest_path))
+
+        # Web assets do not need the source permissions or times
+        errors = utils.copy_files(pairs, self.jobs, return_exceptions=True)
+        for (src_path, _), error in zip(pairs, errors):
+            js_file = os.path.basename(src_path)
+            if error is None:
+                logger.info("Copied JavaScript file: %s", js_file)
+            else:
+                logger.error("Error copying %s: %s", js_file, error)
 
     def _generate_blog_pages(self):
         """Generate blog pages."""
@@ -264,36 +681,22 @@ class StaticSiteGenerator:
         blog_processor = BlogProcessor(self.blogs_path)
         blog_body = blog_processor.generate_blog_collection_page()
         
-        env = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "constants/jinja_templates")
-        ))
-        base_template = env.get_template("base.jinja")
+        base_template = self._tpl_base
         
         # Blog collection page
-        rendered_blog = base_template.render(
-            recipe=self.recipe,
-            body=blog_body,
-            back=" ",
-            version=__version__
-        )
+        rendered_blog = base_template.render(body=blog_body, back=" ")
         
-        with open(os.path.join(self.build_dir, "blogs.html"), "w", encoding='utf-8') as f:
-            f.write(rendered_blog)
+        _write_output(os.path.join(self.build_dir, "blogs.html"), rendered_blog)
         
-        # Individual blog pages
-        blog_template = env.get_template("back_base.jinja")
+        # Individual blog pages, all written into one directory
+        blog_template = self._tpl_blog_post
+        blog_dir = os.path.join(self.build_dir, "blog")
+        os.makedirs(blog_dir, exist_ok=True)
         for blog_file, blog_content in blog_processor.generate_standalone_blog_pages():
-            rendered_blog = blog_template.render(
-                recipe=self.recipe,
-                body=blog_content,
-                back="."
-            )
-            
-            blog_output_path = os.path.join(self.build_dir, "blog", blog_file)
-            os.makedirs(os.path.dirname(blog_output_path), exist_ok=True)
+            rendered_blog = blog_template.render(body=blog_content, back=".")
             
-            with open(blog_output_path, "w", encoding='utf-8') as f:
-                f.write(rendered_blog)
+            blog_output_path = os.path.join(blog_dir, blog_file)
+            _write_output(blog_output_path, rendered_blog)
 
     def _generate_tag_pages(self):
         """Generate tag-related pages."""
@@ -302,33 +705,27 @@ class StaticSiteGenerator:
         
         # TODO: Implement tag page generation logic
         # This part was commented out in the original code
-        logger.info(f"Tag database created with {len(tag_db)} tags")
+        logger.info("Tag database created with %d tags", len(tag_db))
 
 class ssg(StaticSiteGenerator):
     """
     Backward compatibility wrapper for StaticSiteGenerator.
     Maintains the exact same method signature as the original ssg class.
     """
-    def __init__(self, recipe, build=None):
+    def __init__(self, recipe, build=None, jobs=None):
         """
         Initialize the ssg instance.
         
         Args:
             recipe (Dict): Site configuration dictionary
             build (str, optional): Build directory path
+            jobs (int, optional): Worker processes for markdown conversion
         """
-        super().__init__(recipe, build)
+        super().__init__(recipe, build, jobs)
 
         #blog page renderer
         logger.info("generating blogs page srcs")
         if self.blogs_path is not None:
             blog_body= self.blog_renderer()
-            environment = Environment(loader=FileSystemLoader(
-                f"{here}/constants/jinja_templates"))
-            template = environment.get_template("base.jinja")
-            rendered_blog= template.render(recipe=self.recipe,
-                                            body= blog_body,
-                                            back=" ",
-                                            version=__version__)
-            with open(f"{self.build}/blogs.html","w") as file:
-                file.write(rendered_blog)
+            rendered_blog= self._tpl_base.render(body= blog_body, back=" ")
+            _write_output(f"{self.build}/blogs.html", rendered_blog)
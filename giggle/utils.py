@@ -1,10 +1,23 @@
 import os
+import stat
+import pickle
 import shutil
+import time
+import hashlib
+import tempfile
+import functools
 import logging
-from ruamel.yaml import YAML
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 here = os.path.abspath(os.path.dirname(__file__))
 
+_IO_BUFSIZE = 1 << 20
+
+# Parsed yaml files are cached here when GIGGLE_YAML_CACHE=1. It is per user
+# since cache hits are unpickled.
+yaml_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "giggle", "yaml")
+
 logger = logging.getLogger(__name__)
 
 def setup_logging(log_level):
@@ -30,14 +43,11 @@ class FileFormatter(logging.Formatter):
         super(FileFormatter, self).__init__(*args, **kwargs)
 
     def format(self, record):
-        msg = str(record.msg)
-        level_name = str(record.levelname)
-        name = str(record.name)
-        funcName = str(record.funcName)
+        level_name = record.levelname
+        msg = record.getMessage() if record.args else record.msg
         if level_name == 'DEBUG':
-            return '{0:>9s} | {2} | {1}'.format( level_name , msg, name+'.'+funcName)
-        else:
-            return '{0:>9s} | {1}'.format( level_name , msg)
+            return '%9s | %s | %s' % (level_name, f'{record.name}.{record.funcName}', msg)
+        return '%9s | %s' % (level_name, msg)
 class ColoredFormatter(logging.Formatter):
     """
         Class to create a log output which is colored based on level.
@@ -53,22 +63,64 @@ class ColoredFormatter(logging.Formatter):
         }
 
         self.reset = '\033[0m'
+        # per level %-format strings, built once instead of on every record
+        self._debug_fmts = {
+            level: f'{color}%9s | %s | %s{self.reset}'
+            for level, color in self.colors.items()
+        }
+        self._fmts = {
+            level: f'{color}%9s | %s{self.reset}'
+            for level, color in self.colors.items()
+        }
 
     def format(self, record):
-        msg = str(record.msg)
-        level_name = str(record.levelname)
-        name = str(record.name)
-        color_prefix = self.colors[level_name]
-        funcName = str(record.funcName)
+        level_name = record.levelname
+        msg = record.getMessage() if record.args else record.msg
         if level_name == 'DEBUG':
-            return '{0}{1:>9s} | {4} | {2}{3}'.format(color_prefix,
-                                                level_name , msg,
-                                                self.reset, name+'.'+funcName)
-        else:
-            return '{0}{1:>9s} | {2}{3}'.format(color_prefix,
-                                                level_name , msg,
-                                                self.reset)
+            return self._debug_fmts[level_name] % (
+                level_name, f'{record.name}.{record.funcName}', msg)
+        return self._fmts[level_name] % (level_name, msg)
+
+
+@functools.lru_cache(maxsize=None)
+def _libyaml_loader():
+    '''
+    Returns PyYAML's (load, CSafeLoader) pair, or None when PyYAML is missing
+    or was built without libyaml
+    libyaml resolves scalars as YAML 1.1, so it is only used when
+    GIGGLE_FAST_YAML=1; PyYAML is the optional "fast_yaml" extra and is
+    imported here so plain runs never load it.
+    '''
+    try:
+        from yaml import load, CSafeLoader
+    except ImportError:
+        return None
+    return load, CSafeLoader
 
+@functools.lru_cache(maxsize=None)
+def _ruamel_yaml(mode):
+    '''
+    Returns the shared ruamel YAML instance for a mode, configured once
+    Args: mode -> "rt" or "safe" for loading, "dump" for dump_yaml
+    '''
+    # deferred so that --help/--version, which never read a recipe, stay fast
+    from ruamel.yaml import YAML
+
+    if mode == "dump":
+        yaml = YAML(typ="rt")
+        yaml.preserve_quotes = True
+        yaml.default_flow_style = False
+        yaml.allow_unicode = True
+        yaml.compact(seq_seq=False, seq_map=False)
+        return yaml
+
+    yaml = YAML(typ=mode)
+    yaml.default_flow_style = False
+    yaml.allow_unicode = True
+    yaml.compact(seq_seq=False, seq_map=False)
+    yaml.indent = 4
+    yaml.block_seq_indent = 2
+    return yaml
 
 def dump_yaml(foo, outfile):
     '''
@@ -76,72 +128,319 @@ def dump_yaml(foo, outfile):
     Args: foo -> dictionary to be put into yaml
           outfile -> yaml file
     '''
-    yaml = YAML(typ="rt")
-    yaml.preserve_quotes = True
-    yaml.default_flow_style = False
-    yaml.allow_unicode = True
-    yaml.compact(seq_seq=False, seq_map=False)
-    yaml.dump(foo, outfile)
+    _ruamel_yaml("dump").dump(foo, outfile)
+
+def _yaml_cache_path(foo, mode):
+    '''
+    Returns the cache file used for a yaml file
+    Args: foo -> yaml file
+          mode -> loader used, cached separately since results differ per loader
+    '''
+    digest = hashlib.blake2b(os.path.abspath(foo).encode(), digest_size=16).hexdigest()
+    return os.path.join(yaml_cache_dir, f"{digest}-{mode}.pkl")
+
+def _read_yaml_cache(cache, key):
+    '''
+    Returns a (hit, data) pair from the yaml cache
+    Args: cache -> cache file
+          key -> [mtime_ns, size] of the yaml file the entry must match
+    '''
+    try:
+        with open(cache, "rb") as file:
+            cached_key, data = pickle.load(file)
+    except Exception:
+        return False, None
+    if list(cached_key) != key:
+        return False, None
+    return True, data
+
+def _write_yaml_cache(cache, key, data):
+    '''
+    Stores parsed yaml in the cache, silently skipping unserialisable data
+    The entry is written to a temporary file and renamed into place, so an
+    interrupted write never leaves a truncated cache file behind.
+    Args: cache -> cache file
+          key -> [mtime_ns, size] of the yaml file
+          data -> parsed yaml
+    '''
+    tmp = None
+    try:
+        # pickle keeps non-str keys and the loader's own types intact
+        payload = pickle.dumps((key, data), protocol=pickle.HIGHEST_PROTOCOL)
+        os.makedirs(yaml_cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=yaml_cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.replace(tmp, cache)
+    except (AttributeError, TypeError, ValueError, OSError, pickle.PicklingError) as e:
+        logger.debug("Not caching %s: %s", cache, e)
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+def _parse_yaml(foo, mtime_ns, size, mode):
+    '''
+    Parses a yaml file, through the disk cache when GIGGLE_YAML_CACHE=1
+    Args: foo -> yaml file
+          mtime_ns, size -> stat of the file, the cache entry must match them
+          mode -> "fast" (libyaml), "rt" or "safe" (ruamel)
+    '''
+    use_cache = os.environ.get("GIGGLE_YAML_CACHE") == "1"
+    if use_cache:
+        key = [mtime_ns, size]
+        cache = _yaml_cache_path(foo, mode)
+        hit, data = _read_yaml_cache(cache, key)
+        if hit:
+            return data
+
+    # both parsers decode the bytes themselves; the large buffer lets them
+    # pull big recipes in a few reads
+    with open(foo, "rb", buffering=_IO_BUFSIZE) as file:
+        if mode == "fast":
+            load, loader = _libyaml_loader()
+            data = load(file, Loader=loader)
+        else:
+            data = _ruamel_yaml(mode).load(file)
+
+    if use_cache:
+        _write_yaml_cache(cache, key, data)
+    return data
 
-def load_yaml(foo, no_anchors=False):
+def load_yaml(foo, no_anchors=False, preserve_comments=False):
     '''
     This function loads yaml files into dictionaries
     Args: foo -> yaml file
           no_anchors -> Boolean arg to configure yaml loading based on yaml anchors
+          preserve_comments -> Boolean arg to load round trip (ruamel "rt")
+                               objects, needed only when the data is dumped back
+    Recipes are parsed as YAML 1.2 by ruamel. Setting GIGGLE_FAST_YAML=1
+    parses plain loads with libyaml's CSafeLoader instead, which is faster but
+    follows YAML 1.1 (on/off/yes/no are booleans, 12:30 is an integer).
+    Setting GIGGLE_YAML_CACHE=1 reuses the parsed result across runs.
     '''
-    if not os.path.isfile(foo):
-        logger.error(f"{foo} not found!")
+    # one stat serves both the existence check and the cache key
+    try:
+        st = os.stat(foo)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        logger.error("%s not found!", foo)
         raise SystemExit(1)
 
     if no_anchors:
-        yaml = YAML(typ="safe")
+        mode = "safe"
+    elif not preserve_comments and os.environ.get("GIGGLE_FAST_YAML") == "1":
+        if _libyaml_loader() is not None:
+            mode = "fast"
+        else:
+            logger.warning("GIGGLE_FAST_YAML=1 needs PyYAML with libyaml "
+                           "(pip install giggle[fast_yaml]); using ruamel")
+            mode = "rt"
     else:
-        yaml = YAML(typ="rt")
-    yaml.default_flow_style = False
-    yaml.allow_unicode = True
-    yaml.compact(seq_seq=False, seq_map=False)
-    yaml.indent = 4
-    yaml.block_seq_indent = 2
+        mode = "rt"
+
+    return _parse_yaml(foo, st.st_mtime_ns, st.st_size, mode)
+
+# Background removals started by clean_dir, see wait_for_cleanup
+_cleanup_threads = []
+
+def _trash_prefix(directory):
+    '''
+    Returns the path prefix clean_dir renames a directory to before removal
+    Args: directory -> directory being cleaned
+    '''
+    return f"{os.path.normpath(directory)}.trash-"
 
-    with open(foo, "r") as file:
-        return yaml.load(file)
+def _remove_trash(paths):
+    '''
+    Removes renamed-aside directories, ignoring errors
+    Args: paths -> list of trash paths
+    '''
+    for path in paths:
+        if os.path.islink(path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        else:
+            shutil.rmtree(path, ignore_errors=True)
 
 def clean_dir(directory):
     '''
     Cleans the directory recursively if the directory exists
+    An empty directory is removed directly. Otherwise it is renamed aside and
+    deleted on a background thread, so the path can be reused immediately;
+    call wait_for_cleanup() before forking, the interpreter also waits for
+    that thread before exiting. Leftovers of earlier runs that were killed
+    mid-removal are deleted along with it.
+    A symlinked directory keeps its link: the directory it points to is
+    cleaned and recreated empty.
     Args: directory -> directory to be cleaned
     '''
+    if os.path.islink(directory):
+        target = os.path.realpath(directory)
+        if os.path.isdir(target):
+            clean_dir(target)
+            os.makedirs(target, exist_ok=True)
+        return
+
+    prefix = _trash_prefix(directory)
+    parent, trash_name = os.path.split(prefix)
+    try:
+        with os.scandir(parent or os.curdir) as entries:
+            trash = [entry.path for entry in entries
+                     if entry.name.startswith(trash_name)]
+    except OSError:
+        trash = []
 
     # Cleaning the directory
     if os.path.isdir(directory):
-        logger.info(f'Removing directory {directory} recursively')
-        shutil.rmtree(directory)
-    else:
-        pass
+        try:
+            os.rmdir(directory)
+        except OSError:
+            logger.info('Removing directory %s recursively', directory)
+            aside = f"{prefix}{os.getpid()}-{time.time_ns()}"
+            try:
+                os.rename(directory, aside)
+                trash.append(aside)
+            except OSError:
+                shutil.rmtree(directory)
 
-def mover(build, config)-> None:
-    """mover function"""
-    for to_move in config["mover"]:
-        dest= os.path.join(f"{build}/", to_move)
-        shutil.copytree(to_move, dest, dirs_exist_ok=True)
-
-def directory_setup(build, config):
-    """Creates the directory structure"""
-    os.makedirs(f"{build}", exist_ok=True)
-    os.makedirs(f"{build}/tags", exist_ok=True)
-    os.makedirs(f"{build}/blog", exist_ok=True)
-    config_src= load_yaml(config)
-    mover(build, config_src)
+    if trash:
+        thread = threading.Thread(target=_remove_trash, args=(trash,))
+        thread.start()
+        _cleanup_threads.append(thread)
 
-def clean_dir(directory):
+def wait_for_cleanup():
     '''
-    Cleans the directory recursively if the directory exists
-    Args: directory -> directory to be cleaned
+    Waits for the background removals started by clean_dir
+    Forking while they run could leave a child with a lock held by the
+    removal thread, so this is called before a process pool is started.
     '''
+    while _cleanup_threads:
+        _cleanup_threads.pop().join()
 
-    # Cleaning the directory
-    if os.path.isdir(directory):
-        logger.info(f'Removing directory {directory} recursively')
-        shutil.rmtree(directory)
-    else:
-        pass
+def _fast_copy(src, dst):
+    '''
+    Copies the contents of a file without its metadata
+    Tries os.copy_file_range (a reflink on CoW filesystems), then os.sendfile,
+    then a plain 1 MiB readinto loop; a method that fails or copies less than
+    the source size hands over to the next one
+    Args: src -> source file
+          dst -> destination file, truncated if it exists
+    Raises shutil.SameFileError when dst is src, as opening dst for writing
+    would truncate the source before it is read.
+    '''
+    try:
+        same = os.path.samefile(src, dst)
+    except OSError:
+        # dst does not exist yet (or src is missing, which open reports)
+        same = False
+    if same:
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        count = max(size, _IO_BUFSIZE)
+        copiers = []
+        if hasattr(os, "copy_file_range"):
+            copiers.append(lambda: os.copy_file_range(in_fd, out_fd, count))
+        if hasattr(os, "sendfile"):
+            copiers.append(lambda: os.sendfile(out_fd, in_fd, None, count))
+        for copy_chunk in copiers:
+            copied = 0
+            try:
+                while True:
+                    n = copy_chunk()
+                    if not n:
+                        break
+                    copied += n
+            except OSError:
+                # e.g. EXDEV/ENOSYS/EINVAL
+                copied = 0
+            # procfs/sysfs and some FUSE or network mounts report 0 (or stop
+            # short) for files that do have data; only a full copy counts
+            if copied and copied >= size:
+                return
+            # restart with the next method
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        buf = memoryview(bytearray(_IO_BUFSIZE))
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            fdst.write(buf[:n])
+
+def _plan_copytree(src, dst, pairs):
+    '''
+    Creates the directory tree of src under dst and collects the files to copy
+    Directories are made here, up front, so copy workers never race on them
+    Args: src -> source directory
+          dst -> destination directory, merged into if it exists
+          pairs -> list the (src, dst) file pairs are appended to
+    '''
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _plan_copytree(entry.path, target, pairs)
+            else:
+                pairs.append((entry.path, target))
+
+def copy_files(pairs, jobs=None, return_exceptions=False):
+    '''
+    Copies (src, dst) file pairs with _fast_copy on a thread pool
+    The copy syscalls release the GIL, so threads overlap the file latency
+    Args: pairs -> list of (src, dst) tuples whose parent directories exist
+          jobs -> number of copy threads, 1 copies serially
+                  (default: min(32, 4 * cpu count))
+          return_exceptions -> Boolean arg; instead of raising the first
+                  failure, every pair is attempted and its exception (or None
+                  on success) is returned in the order of pairs
+    '''
+    def copy_one(pair):
+        try:
+            _fast_copy(*pair)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+        return None
+
+    if jobs is None:
+        jobs = min(32, (os.cpu_count() or 1) * 4)
+    if jobs <= 1 or len(pairs) <= 1:
+        return [copy_one(pair) for pair in pairs]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(copy_one, pairs))
+
+def mover(build, config, jobs=None)-> None:
+    """mover function"""
+    build = os.fspath(build)
+    pairs = []
+    for to_move in config.get("mover", []):
+        dest= os.path.join(build, to_move)
+        _plan_copytree(to_move, dest, pairs)
+    copy_files(pairs, jobs)
+
+def directory_setup(build, config, jobs=None):
+    """Creates the directory structure
+
+    config may be the recipe path or an already loaded recipe dict
+    """
+    os.makedirs(build, exist_ok=True)
+    # the parent exists now, so a single mkdir per subdirectory is enough
+    for sub in ("tags", "blog"):
+        try:
+            os.mkdir(os.path.join(build, sub))
+        except FileExistsError:
+            pass
+    config_src= config if isinstance(config, dict) else load_yaml(config)
+    mover(build, config_src, jobs)
@@ -39,6 +39,10 @@ setup(
     package_dir={'giggle': 'giggle/'},
     package_data={'giggle': ['requirements.txt']},
     install_requires = requirements,
+    extras_require = {
+        'fast_markdown': ['cmarkgfm'],
+        'fast_yaml': ['PyYAML>=6.0'],
+    },
     python_requires = ">=3.10",
     entry_points={
         'console_scripts': ['giggle=giggle.main:cli'],
@@ -0,0 +1,184 @@
+import os
+import json
+import shutil
+
+import markdown
+import pytest
+
+from giggle import ssg, utils
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+DOCUMENTS = {
+    "plain": "title: Hello\ntags: #a,#b\n\n# Body\n",
+    "fenced": "---\ntitle: Hello\nDate: 22-10-2024\n---\n# Body\n",
+    "ended": "title: Hello\n...\nBody\n",
+    "continued": "title: Hello\nauthors: one\n    two\n\nBody\n",
+    "no_meta": "# Just a body\n\ntext\n",
+    "header_only": "title: Hello\n",
+    "tabs": "title:\tHello\n\nBody\n",
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("name", sorted(DOCUMENTS))
+def test_read_markdown_meta_matches_meta_extension(tmp_path, name):
+    path = tmp_path / f"{name}.md"
+    path.write_text(DOCUMENTS[name])
+    md = markdown.Markdown(extensions=['meta'])
+    md.convert(DOCUMENTS[name])
+
+    assert ssg._read_markdown_meta(str(path)) == md.Meta
+
+
+@pytest.mark.parametrize("text, body", [
+    ("title: Hello\n\n# Body\n", "# Body\n"),
+    ("---\ntitle: Hello\n---\n# Body\n", "# Body\n"),
+    ("title: Hello\n# Body\n", "# Body\n"),
+    ("# Body\n", "# Body\n"),
+])
+def test_scan_meta_returns_body_start(text, body):
+    lines = text.splitlines(keepends=True)
+
+    _, body_start = ssg._scan_meta(lines)
+
+    assert ''.join(lines[body_start:]) == body
+
+
+
+@pytest.mark.skipif(ssg.cmarkgfm is None, reason="cmarkgfm not installed")
+def test_fast_markdown_keeps_raw_html_and_meta(tmp_path):
+    path = tmp_path / "page.md"
+    path.write_text("title: Hello\n\n<div class=\"box\">raw</div>\n\n*text*\n")
+
+    html, meta = ssg._parse_markdown(str(path), fast=True)
+    slow_html, slow_meta = ssg._parse_markdown(str(path))
+
+    assert meta == slow_meta == {"title": ["Hello"]}
+    assert '<div class="box">raw</div>' in html
+    assert '<div class="box">raw</div>' in slow_html
+    assert "<em>text</em>" in html
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "pages"
+    shutil.copytree(os.path.join(REPO, "sample_config", "sample_markdowns"), src)
+    recipe = utils.load_yaml(os.path.join(REPO, "sample_config", "sample_recipe.yaml"))
+    recipe["pages"] = {
+        "index": str(src / "main.md"),
+        "contact": str(src / "contacts.md"),
+    }
+    return recipe
+
+
+def _build(recipe, build_dir="build"):
+    os.makedirs(build_dir, exist_ok=True)
+    generator = ssg.StaticSiteGenerator(recipe, build_dir, jobs=1)
+    generator._generate_pages()
+    generator._generate_css()
+    generator._save_manifest()
+
+
+def _mark_outputs(build_dir="build"):
+    for name in ("index.html", "contact.html", "style.css"):
+        with open(os.path.join(build_dir, name), "w") as f:
+            f.write("old")
+
+
+def _rebuilt(build_dir="build"):
+    return sorted(
+        name for name in ("index.html", "contact.html", "style.css")
+        if open(os.path.join(build_dir, name)).read() != "old"
+    )
+
+
+def test_no_clear_build_skips_unchanged_outputs(site):
+    _build(site)
+    _mark_outputs()
+
+    _build(site)
+
+    assert _rebuilt() == []
+
+
+def test_no_clear_build_rebuilds_changed_source_only(site):
+    _build(site)
+    _mark_outputs()
+    with open(site["pages"]["contact"], "a") as f:
+        f.write("\nmore\n")
+    os.utime(site["pages"]["index"])
+
+    _build(site)
+
+    assert _rebuilt() == ["contact.html"]
+
+
+def test_no_clear_build_rebuilds_on_recipe_change(site):
+    _build(site)
+    _mark_outputs()
+    site["title"] = "Another title"
+
+    _build(site)
+
+    assert _rebuilt() == ["contact.html", "index.html", "style.css"]
+
+
+def test_no_clear_build_rebuilds_on_renderer_change(site, monkeypatch):
+    _build(site)
+    _mark_outputs()
+    monkeypatch.setattr(ssg.markdown, "__version__", "0.0")
+
+    _build(site)
+
+    assert _rebuilt() == ["contact.html", "index.html", "style.css"]
+
+
+@pytest.mark.skipif(ssg.cmarkgfm is None, reason="cmarkgfm not installed")
+def test_no_clear_build_rebuilds_when_fast_markdown_toggles(site):
+    _build(site)
+    _mark_outputs()
+    site["features"] = {"fast_markdown": True}
+
+    _build(site)
+
+    assert "index.html" in _rebuilt()
+
+
+def test_manifest_matches_equivalent_build_paths(site):
+    _build(site, "build")
+    _mark_outputs()
+
+    _build(site, "./build/")
+
+    assert _rebuilt() == []
+
+
+def test_manifest_prunes_outputs_no_longer_produced(site):
+    _build(site)
+    del site["pages"]["contact"]
+
+    _build(site)
+
+    assert not os.path.exists(os.path.join("build", "contact.html"))
+    with open(os.path.join("build", ssg.MANIFEST_NAME)) as f:
+        assert sorted(json.load(f)) == ["index.html", "style.css"]
+
+
+def test_numeric_page_keys_build(site):
+    site["pages"][404] = site["pages"]["contact"]
+
+    _build(site)
+    _mark_outputs()
+    _build(site)
+
+    assert os.path.exists(os.path.join("build", "404.html"))
+    assert _rebuilt() == []
+
+
+def test_build_key_tells_numeric_and_string_keys_apart():
+    assert ssg._canonical({404: "a"}) != ssg._canonical({"404": "a"})
+    assert ssg._canonical({"a": [{1: "x"}], 2: ("y",)}) == {
+        "a": [{"int:1": "x"}], "int:2": ["y"]}
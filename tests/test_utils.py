@@ -0,0 +1,301 @@
+import os
+import shutil
+
+import pytest
+
+from giggle import utils
+
+
+RECIPE = "1: one\non: yes\nt: 12:30\nnested:\n  2: two\n"
+
+
+@pytest.fixture
+def yaml_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(utils, "yaml_cache_dir", str(cache_dir))
+    monkeypatch.setenv("GIGGLE_YAML_CACHE", "1")
+    return cache_dir
+
+
+def _write_recipe(tmp_path, text=RECIPE):
+    path = tmp_path / "recipe.yaml"
+    path.write_text(text)
+    return str(path)
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+@pytest.mark.parametrize("no_anchors", [False, True])
+def test_yaml_cache_round_trip_keeps_keys(tmp_path, yaml_cache, no_anchors):
+    path = _write_recipe(tmp_path)
+    mode = "safe" if no_anchors else "rt"
+
+    data = utils.load_yaml(path, no_anchors=no_anchors, preserve_comments=True)
+    hit, cached = utils._read_yaml_cache(utils._yaml_cache_path(path, mode),
+                                         _stat_key(path))
+
+    assert hit
+    assert dict(cached) == dict(data)
+    assert 1 in cached and "1" not in cached
+    assert dict(cached["nested"]) == {2: "two"}
+
+
+def test_yaml_cache_miss_on_changed_file(tmp_path, yaml_cache):
+    path = _write_recipe(tmp_path)
+    cache = utils._yaml_cache_path(path, "safe")
+    utils._write_yaml_cache(cache, _stat_key(path), {"a": 1})
+
+    hit, _ = utils._read_yaml_cache(cache, [0, 0])
+
+    assert not hit
+
+
+def test_truncated_yaml_cache_is_ignored(tmp_path, yaml_cache):
+    path = _write_recipe(tmp_path)
+    cache = utils._yaml_cache_path(path, "safe")
+    utils._write_yaml_cache(cache, _stat_key(path), {"a": 1})
+    with open(cache, "r+b") as file:
+        file.truncate(5)
+
+    hit, _ = utils._read_yaml_cache(cache, _stat_key(path))
+
+    assert not hit
+
+
+def test_yaml_cache_write_leaves_no_temp_files(tmp_path, yaml_cache):
+    path = _write_recipe(tmp_path)
+    cache = utils._yaml_cache_path(path, "safe")
+
+    utils._write_yaml_cache(cache, _stat_key(path), {"a": 1})
+    utils._write_yaml_cache(cache, _stat_key(path), {"a": 2})
+
+    assert os.listdir(yaml_cache) == [os.path.basename(cache)]
+    assert utils._read_yaml_cache(cache, _stat_key(path)) == (True, {"a": 2})
+
+
+def test_unpicklable_data_is_not_cached(tmp_path, yaml_cache):
+    path = _write_recipe(tmp_path)
+    cache = utils._yaml_cache_path(path, "safe")
+
+    utils._write_yaml_cache(cache, _stat_key(path), {"a": lambda: None})
+
+    assert not os.path.exists(cache)
+    assert not yaml_cache.exists() or os.listdir(yaml_cache) == []
+
+
+def test_load_yaml_defaults_to_yaml_1_2(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIGGLE_FAST_YAML", raising=False)
+    monkeypatch.delenv("GIGGLE_YAML_CACHE", raising=False)
+    path = _write_recipe(tmp_path)
+
+    data = utils.load_yaml(path)
+
+    assert data[1] == "one"
+    assert data["on"] == "yes"
+    assert data["t"] == "12:30"
+
+
+@pytest.mark.skipif(utils._libyaml_loader() is None, reason="PyYAML with libyaml not installed")
+def test_fast_yaml_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIGGLE_FAST_YAML", "1")
+    monkeypatch.delenv("GIGGLE_YAML_CACHE", raising=False)
+    path = _write_recipe(tmp_path, "t: 12:30\n")
+
+    assert utils.load_yaml(path) == {"t": 750}
+    assert utils.load_yaml(path, preserve_comments=True)["t"] == "12:30"
+
+
+@pytest.mark.parametrize("size", [0, 5, (1 << 20) + 17])
+def test_fast_copy_copies_contents(tmp_path, size):
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    src.write_bytes(os.urandom(size))
+    dst.write_bytes(b"x" * (size + 100))
+
+    utils._fast_copy(str(src), str(dst))
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_fast_copy_falls_back_when_kernel_copy_fails(tmp_path, monkeypatch):
+    def unsupported(*args):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+    monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    src.write_bytes(os.urandom(3 * (1 << 20) + 1))
+
+    utils._fast_copy(str(src), str(dst))
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
+@pytest.mark.parametrize("short", [0, 7])
+def test_fast_copy_falls_back_on_short_kernel_copy(tmp_path, monkeypatch, short):
+    results = iter([short])
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: next(results, 0),
+                        raising=False)
+    monkeypatch.setattr(os, "sendfile", lambda *args: 0, raising=False)
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    src.write_bytes(os.urandom((1 << 20) + 3))
+
+    utils._fast_copy(str(src), str(dst))
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_fast_copy_refuses_to_copy_a_file_onto_itself(tmp_path):
+    src = tmp_path / "a.txt"
+    src.write_text("keep me")
+
+    with pytest.raises(shutil.SameFileError):
+        utils._fast_copy(str(src), str(tmp_path / "." / "a.txt"))
+
+    assert src.read_text() == "keep me"
+
+
+def _make_tree(root):
+    (root / "sub" / "deeper").mkdir(parents=True)
+    (root / "a.txt").write_text("a")
+    (root / "sub" / "b.txt").write_text("b")
+    (root / "sub" / "deeper" / "c.txt").write_text("c")
+
+
+def _tree_contents(root):
+    return {
+        os.path.relpath(os.path.join(dirpath, name), root): open(os.path.join(dirpath, name)).read()
+        for dirpath, _, files in os.walk(root)
+        for name in files
+    }
+
+
+def test_plan_copytree_creates_dirs_and_lists_files(tmp_path):
+    src = tmp_path / "src"
+    _make_tree(src)
+    dst = tmp_path / "dst"
+    pairs = []
+
+    utils._plan_copytree(str(src), str(dst), pairs)
+
+    assert (dst / "sub" / "deeper").is_dir()
+    assert sorted(os.path.relpath(d, dst) for _, d in pairs) == [
+        "a.txt", os.path.join("sub", "b.txt"), os.path.join("sub", "deeper", "c.txt")]
+    assert _tree_contents(dst) == {}
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_copy_files_copies_planned_tree(tmp_path, jobs):
+    src = tmp_path / "src"
+    _make_tree(src)
+    dst = tmp_path / "dst"
+    pairs = []
+    utils._plan_copytree(str(src), str(dst), pairs)
+
+    utils.copy_files(pairs, jobs)
+
+    assert _tree_contents(dst) == _tree_contents(src)
+
+
+def test_mover_merges_into_existing_build(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _make_tree(tmp_path / "assets")
+    (tmp_path / "build" / "assets").mkdir(parents=True)
+    (tmp_path / "build" / "assets" / "kept.txt").write_text("kept")
+
+    utils.mover("build", {"mover": ["assets"]}, jobs=2)
+
+    copied = _tree_contents(tmp_path / "build" / "assets")
+    assert copied.pop("kept.txt") == "kept"
+    assert copied == _tree_contents(tmp_path / "assets")
+
+
+def test_clean_dir_removes_tree(tmp_path):
+    build = tmp_path / "build"
+    _make_tree(build)
+
+    utils.clean_dir(str(build))
+    utils.wait_for_cleanup()
+
+    assert not build.exists()
+    assert os.listdir(tmp_path) == []
+
+
+def test_clean_dir_ignores_missing_directory(tmp_path):
+    utils.clean_dir(str(tmp_path / "build"))
+    utils.wait_for_cleanup()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_clean_dir_sweeps_trash_of_killed_runs(tmp_path):
+    stale = tmp_path / "build.trash-1-2"
+    _make_tree(stale)
+    (tmp_path / "build.trash-3-4").symlink_to(tmp_path / "elsewhere")
+    (tmp_path / "build").mkdir()
+
+    utils.clean_dir(str(tmp_path / "build"))
+    utils.wait_for_cleanup()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_clean_dir_keeps_symlinked_build_dir(tmp_path):
+    target = tmp_path / "real"
+    _make_tree(target)
+    link = tmp_path / "build"
+    link.symlink_to(target)
+
+    utils.clean_dir(str(link))
+    utils.wait_for_cleanup()
+
+    assert link.is_symlink()
+    assert target.is_dir() and os.listdir(target) == []
+    assert sorted(os.listdir(tmp_path)) == ["build", "real"]
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_copy_files_can_report_each_failure(tmp_path, jobs):
+    good = tmp_path / "good.txt"
+    good.write_text("good")
+    pairs = [
+        (str(good), str(tmp_path / "copy1.txt")),
+        (str(tmp_path / "missing.txt"), str(tmp_path / "copy2.txt")),
+        (str(good), str(tmp_path / "copy3.txt")),
+    ]
+
+    errors = utils.copy_files(pairs, jobs, return_exceptions=True)
+
+    assert errors[0] is None and errors[2] is None
+    assert isinstance(errors[1], FileNotFoundError)
+    assert (tmp_path / "copy3.txt").read_text() == "good"
+
+
+def test_copy_files_raises_by_default(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        utils.copy_files([(str(tmp_path / "missing"), str(tmp_path / "dst"))], 1)
+
+
+def test_fast_yaml_falls_back_without_pyyaml(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIGGLE_FAST_YAML", "1")
+    monkeypatch.delenv("GIGGLE_YAML_CACHE", raising=False)
+    monkeypatch.setattr(utils, "_libyaml_loader", lambda: None)
+    path = _write_recipe(tmp_path, "t: 12:30\n")
+
+    assert utils.load_yaml(path)["t"] == "12:30"
+
+
+def test_mover_with_absolute_entry_keeps_sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _make_tree(tmp_path / "assets")
+    before = _tree_contents(tmp_path / "assets")
+
+    with pytest.raises(shutil.SameFileError):
+        utils.mover("build", {"mover": [str(tmp_path / "assets")]}, jobs=1)
+
+    assert _tree_contents(tmp_path / "assets") == before